@@ -5,7 +5,9 @@ This file is a documentation-safe representation of the Aetheron backend.
 The production backend includes:
 • Request routing and template rendering  
 • Payment verification and wallet authentication  
+• Verified-transaction caching for X402 payment checks  
 • Celery-based distributed task processing  
+• Push-based task results over SSE / WebSocket  
 • Ledger and asset history tracking  
 • Agent packaging and signed ZIP delivery  
 • Solana RPC integrations  
@@ -14,7 +16,8 @@ The production backend includes:
 • Error handling, rate limits, and security layers  
 
 All operational logic, algorithms, validation rules, 
-and internal service interactions have been removed.
+and internal service interactions have been removed, 
+except where noted below.
 
 This template exists solely for:
 • Architectural overview  
@@ -26,6 +29,8 @@ It does NOT include:
 • Business rules  
 • Proprietary or security-critical code  
 • Agent generation or packaging logic  
-• Payment enforcement systems  
+• Payment enforcement systems (payment_cache_template.py only matches
+  already-verified payments to a request; on-chain verification is a
+  placeholder)  
 
 The real implementation is private and protected.
@@ -17,6 +17,7 @@ The real worker includes:
 • Snapshot caching for change detection
 • PDF/TXT/HTML/MD/DOCX generation pipelines
 • R2 cloud uploads, filename signing, and secure retrieval
+• Task progress + result events published over Redis pub/sub
 • Ledger recording + billing for each asset
 • Memory safety, request limits, and per-task sandbox rules
 
@@ -34,3 +35,8 @@ This template exists ONLY to:
 
 The real implementation is private and significantly more advanced.
 """
+
+
+# Registers the task_failure / task_revoked publishers that end the
+# web-side task event streams (see task_events_template.py).
+import task_publisher_template  # noqa: F401
@@ -0,0 +1,413 @@
+"""
+Aetheron — X402 Payment Verification Cache Template
+---------------------------------------------------
+
+This module provides a documentation-safe structural template for the
+verified-transaction cache used in front of X402 payment checks.
+
+Retries, page reloads, and multi-format downloads of the same purchase
+all present the same `tx_signature`. Once a transaction is finalized its
+verification result cannot change, so it is verified against Solana RPC
+once and then served from cache.
+
+The template preserves:
+• An in-process LRU in front of a shared Redis cache, keyed by
+  component + signature
+• Per-request checks of payer wallet, recipient, and amount on every
+  cache hit
+• Storage of finalized results only
+• Coalescing of concurrent verifications of the same signature, with
+  sync (thread) and async (event loop) entry points
+• Seeding from existing ledger entries
+
+The production implementation additionally includes:
+• Full payment validation (recipient, amount, token mint, memo)
+• Replay protection across wallets and components
+• RPC failover and timeout handling
+"""
+
+import os
+import json
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import redis
+
+from ledger_utils_template import row_to_dict, get_recent
+
+
+# -------------------------------------------------------------------------
+# ENVIRONMENT CONFIG
+# -------------------------------------------------------------------------
+
+REDIS_URL = os.getenv("REDIS_URL")
+SOLANA_RPC_URL = os.getenv("SOLANA_RPC_URL")
+
+CACHE_PREFIX = "aetheron:x402:tx:"
+CACHE_TTL = 7 * 24 * 3600      # seconds a verified signature stays in Redis
+LRU_SIZE = 4096                # entries kept in the in-process LRU
+
+FINALIZED = "finalized"
+
+
+def _cache_key(tx_sig: str, component: str) -> str:
+    return f"{CACHE_PREFIX}{component}:{tx_sig}"
+
+
+# -------------------------------------------------------------------------
+# RPC VERIFICATION (STRUCTURE ONLY)
+# -------------------------------------------------------------------------
+
+def _rpc_verify(tx_sig: str, component: str):
+    """
+    Verifies a transaction signature against Solana RPC.
+
+    REAL BACKEND:
+    - Calls getTransaction on SOLANA_RPC_URL.
+    - Validates the token mint and memo for the component.
+    - Reports the on-chain payer, recipient, amount, and confirmation
+      status; payer, recipient, and amount are checked per request by
+      payment_matches().
+
+    TEMPLATE:
+    - Returns None (unverified).
+
+    Expected return shape:
+    {"tx_signature", "component", "wallet", "recipient", "amount",
+     "confirmation_status", "source": "rpc"}
+    """
+    return None
+
+
+# -------------------------------------------------------------------------
+# IN-PROCESS LRU
+# -------------------------------------------------------------------------
+
+class _LRUCache:
+    """
+    Small thread-safe LRU used in front of Redis.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+
+_local = _LRUCache(LRU_SIZE)
+
+_redis = None
+
+_inflight = {}                 # (component, tx_sig) -> Future
+_inflight_lock = threading.Lock()
+
+_async_inflight = {}           # (component, tx_sig) -> asyncio.Task
+
+
+def _redis_client():
+    """
+    Returns a process-wide Redis client, or None when REDIS_URL is unset
+    or invalid; the cache then runs on the in-process LRU alone.
+    """
+    global _redis
+    if _redis is None and REDIS_URL:
+        try:
+            _redis = redis.Redis.from_url(REDIS_URL)
+        except ValueError:
+            return None
+    return _redis
+
+
+# -------------------------------------------------------------------------
+# CACHE ACCESS
+# -------------------------------------------------------------------------
+
+def get_cached_verification(tx_sig: str, component: str):
+    """
+    Returns a cached verification result, or None.
+
+    Checks the in-process LRU first, then Redis; Redis hits are promoted
+    into the LRU. A missing or unreachable Redis, or a corrupt cached
+    value, is treated as a miss, so verification falls through to RPC
+    instead of failing the request.
+    """
+    result = _local.get((component, tx_sig))
+    if result is not None:
+        return result
+
+    client = _redis_client()
+    if client is None:
+        return None
+
+    try:
+        raw = client.get(_cache_key(tx_sig, component))
+    except redis.RedisError:
+        return None
+    if raw is None:
+        return None
+
+    try:
+        result = json.loads(raw)
+    except ValueError:
+        return None
+    if (
+        not isinstance(result, dict)
+        or result.get("confirmation_status") != FINALIZED
+        or _paid_amount(result) is None
+    ):
+        return None
+
+    _local.set((component, tx_sig), result)
+    return result
+
+
+def store_verification(tx_sig: str, component: str, result: dict):
+    """
+    Stores a verification result in both cache tiers.
+
+    Only finalized transactions are cached; anything else is ignored so
+    that a not-yet-final result is re-checked on the next request. A
+    missing Redis or a failed write only skips the shared tier; the
+    verification itself still succeeds.
+    """
+    if not result or result.get("confirmation_status") != FINALIZED:
+        return False
+
+    _local.set((component, tx_sig), result)
+
+    client = _redis_client()
+    if client is None:
+        return True
+
+    try:
+        client.set(_cache_key(tx_sig, component), json.dumps(result), ex=CACHE_TTL)
+    except redis.RedisError:
+        pass
+    return True
+
+
+# -------------------------------------------------------------------------
+# VERIFICATION ENTRY POINT
+# -------------------------------------------------------------------------
+
+def _as_number(value):
+    """
+    Returns a price / amount as a float, or None if it is missing or not
+    numeric.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number != number:           # NaN
+        return None
+    return number
+
+
+def _paid_amount(result: dict):
+    """
+    Returns the amount a result covers: the on-chain amount for RPC
+    results, the recorded component price for ledger-seeded ones.
+    """
+    key = "price" if result.get("source") == "ledger" else "amount"
+    return _as_number(result.get(key))
+
+
+def payment_matches(result: dict, *, wallet: str, recipient: str, amount) -> bool:
+    """
+    Checks a verification result against the current request.
+
+    Signatures are public, so every result must have been paid by the
+    requesting `wallet` to the expected `recipient`.
+
+    • RPC results must also carry an on-chain amount of at least `amount`
+    • Ledger-seeded results carry no on-chain amount; they match when the
+      recorded component price covers `amount`
+    """
+    if not result:
+        return False
+
+    if result.get("wallet") != wallet or result.get("recipient") != recipient:
+        return False
+
+    paid = _paid_amount(result)
+    return paid is not None and paid >= float(amount)
+
+
+def _verify_cached(tx_sig: str, component: str):
+    """
+    Returns the verification result for a signature and component,
+    from cache or from a single coalesced RPC call.
+    """
+    result = get_cached_verification(tx_sig, component)
+    if result is not None:
+        return result
+
+    key = (component, tx_sig)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not leader:
+        return future.result()
+
+    try:
+        # A previous leader may have stored its result and left _inflight
+        # between our cache miss and taking leadership.
+        result = get_cached_verification(tx_sig, component)
+        if result is None:
+            result = _rpc_verify(tx_sig, component)
+            store_verification(tx_sig, component, result)
+        future.set_result(result)
+    except Exception as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+    return result
+
+
+def verify_tx_signature(
+    tx_sig: str, *, component: str, wallet: str, recipient: str, amount
+):
+    """
+    Verifies a payment for a component request.
+
+    `amount` is the component price in the same units as the ledger
+    `price` column.
+
+    • Served from cache when the signature is already verified for this
+      component
+    • Concurrent calls for the same signature and component in this
+      process share a single RPC call
+    • Finalized results are written to the cache
+    • Every result, cached or fresh, is checked against this request's
+      payer wallet, recipient, and amount
+
+    Blocking: coalesced callers wait on a threading Future. Call it from
+    sync routes or through run_in_threadpool(); `async def` routes should
+    use averify_tx_signature() instead.
+
+    Returns the verification result, or None if it does not cover the
+    request.
+    """
+    result = _verify_cached(tx_sig, component)
+    if not payment_matches(
+        result, wallet=wallet, recipient=recipient, amount=amount
+    ):
+        return None
+    return result
+
+
+async def averify_tx_signature(
+    tx_sig: str, *, component: str, wallet: str, recipient: str, amount
+):
+    """
+    Async variant of verify_tx_signature() for `async def` routes.
+
+    The blocking cache / RPC work runs in a worker thread. Concurrent
+    calls on the event loop for the same signature and component await
+    one shared task, so waiting callers hold neither the loop nor extra
+    threads.
+    """
+    key = (component, tx_sig)
+    task = _async_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(
+            asyncio.to_thread(_verify_cached, tx_sig, component)
+        )
+        _async_inflight[key] = task
+        task.add_done_callback(lambda _: _async_inflight.pop(key, None))
+
+    # Shielded so one cancelled caller does not cancel the shared lookup.
+    result = await asyncio.shield(task)
+    if not payment_matches(
+        result, wallet=wallet, recipient=recipient, amount=amount
+    ):
+        return None
+    return result
+
+
+# -------------------------------------------------------------------------
+# LEDGER SEEDING
+# -------------------------------------------------------------------------
+
+def seed_from_ledger(rows=None, limit=1000, *, recipient: str, paid_statuses):
+    """
+    Seeds the cache from ledger rows.
+
+    The ledger schema does not define its `status` values, so the caller
+    passes `paid_statuses`: the statuses the ledger only writes once the
+    row's payment has been verified at finalized commitment. That is
+    what lets a seeded row be stored as finalized without another RPC
+    call; passing a status written before finality would break the
+    "finalized results only" rule of this cache.
+
+    Seeded entries are marked `"source": "ledger"` and carry the
+    component `price` rather than an on-chain amount; see
+    payment_matches(). Rows without a wallet or with a missing /
+    non-numeric price are skipped.
+
+    The ledger has no recipient column: `recipient` is the address the
+    seeded payments were validated against. A row carrying its own
+    "recipient" (dict rows) uses that instead.
+
+    REAL BACKEND:
+    - Called on startup with recent ledger rows.
+
+    TEMPLATE:
+    - Uses get_recent(), which returns an empty list.
+
+    Returns the number of signatures seeded.
+    """
+    if rows is None:
+        rows = get_recent(limit=limit)
+
+    seeded = 0
+    for row in rows:
+        entry = row if isinstance(row, dict) else row_to_dict(row)
+        if not entry or not entry.get("tx_signature") or not entry.get("wallet"):
+            continue
+        if entry.get("status") not in paid_statuses:
+            continue
+
+        price = _as_number(entry.get("price"))
+        if price is None:
+            continue
+
+        result = {
+            "tx_signature": entry["tx_signature"],
+            "component": entry["component"],
+            "wallet": entry["wallet"],
+            "recipient": entry.get("recipient") or recipient,
+            "price": price,
+            "confirmation_status": FINALIZED,
+            "source": "ledger",
+        }
+        if store_verification(entry["tx_signature"], entry["component"], result):
+            seeded += 1
+
+    return seeded
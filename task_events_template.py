@@ -0,0 +1,417 @@
+"""
+Aetheron — Task Event Streaming Template
+----------------------------------------
+
+This module provides a documentation-safe structural template for the
+push-based task result delivery used in the Aetheron backend.
+
+Instead of polling the Celery result backend, clients open a single
+stream per task and receive progress events and the final R2 URL as
+soon as the worker publishes them.
+
+The template preserves:
+• A Redis pub/sub channel per Celery task, published to by the worker
+  (see task_publisher_template.py)
+• One shared Redis subscriber connection per web process
+• Server-Sent Events and WebSocket endpoints on a FastAPI router
+
+The production implementation additionally includes:
+• Wallet / payment checks before a stream is opened
+• Per-wallet connection limits and rate limiting
+• Structured event payloads for each component pipeline
+• Metrics and monitoring for open streams
+"""
+
+import os
+import json
+import asyncio
+import contextlib
+
+import anyio
+import redis
+import redis.asyncio as aioredis
+from celery.result import AsyncResult
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from task_publisher_template import (
+    TERMINAL_EVENTS,
+    event_message,
+    last_event_key,
+    task_channel,
+)
+
+
+# -------------------------------------------------------------------------
+# ENVIRONMENT CONFIG
+# -------------------------------------------------------------------------
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+HEARTBEAT_INTERVAL = 15        # seconds between keep-alive frames
+MAX_STREAM_LIFETIME = 900      # seconds before an open stream is ended
+RECONNECT_ATTEMPTS = 5         # pub/sub reconnects before streams are closed
+RECONNECT_BACKOFF = 0.5        # seconds before the first reconnect
+RECONNECT_BACKOFF_MAX = 8      # seconds, cap for the doubling backoff
+
+FAILED_STATES = ("FAILURE", "REVOKED")
+
+
+# Queue markers sent by TaskEventHub alongside raw payloads
+RESYNC = object()              # reconnected; events may have been missed
+CLOSED = object()              # Redis unavailable; the stream must end
+
+
+# -------------------------------------------------------------------------
+# WEB SIDE — SHARED SUBSCRIBER
+# -------------------------------------------------------------------------
+
+class TaskEventHub:
+    """
+    Multiplexes all task subscribers of a web process onto one Redis
+    pub/sub connection.
+
+    • Each channel is subscribed once, on its first listener
+    • Incoming messages are fanned out to per-listener asyncio queues
+    • Channels are unsubscribed when their last listener leaves
+    • On connection errors the hub reconnects with backoff and
+      re-subscribes; listeners receive RESYNC so they can re-read any
+      terminal event missed in the gap, or CLOSED if Redis stays down
+    """
+
+    def __init__(self, url: str = None):
+        self._url = url or REDIS_URL
+        self._redis = None
+        self._pubsub = None
+        self._reader = None
+        self._listeners = {}          # channel -> set of asyncio.Queue
+        self._lock = asyncio.Lock()
+
+    async def _ensure_started(self):
+        if self._redis is None:
+            self._redis = aioredis.from_url(self._url)
+        if self._pubsub is None:
+            self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _reset_pubsub(self):
+        if self._pubsub is not None:
+            with contextlib.suppress(redis.RedisError):
+                await self._pubsub.aclose()
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+
+    def _broadcast(self, item):
+        for listeners in self._listeners.values():
+            for queue in listeners:
+                queue.put_nowait(item)
+
+    async def _reconnect(self) -> bool:
+        delay = RECONNECT_BACKOFF
+        for _ in range(RECONNECT_ATTEMPTS):
+            await asyncio.sleep(delay)
+            async with self._lock:
+                try:
+                    await self._reset_pubsub()
+                    if self._listeners:
+                        await self._pubsub.subscribe(*self._listeners)
+                except redis.RedisError:
+                    delay = min(delay * 2, RECONNECT_BACKOFF_MAX)
+                    continue
+                self._broadcast(RESYNC)
+                return True
+
+        async with self._lock:
+            self._broadcast(CLOSED)
+            self._listeners.clear()
+        return False
+
+    async def _read_loop(self):
+        while True:
+            # Only read once a SUBSCRIBE has gone through; before that the
+            # pubsub has no connection to read from.
+            if not self._listeners or not self._pubsub.subscribed:
+                await asyncio.sleep(0.1)
+                continue
+
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except redis.RedisError:
+                await self._reconnect()
+                continue
+
+            if message is None or message.get("type") != "message":
+                continue
+
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+
+            for queue in tuple(self._listeners.get(channel, ())):
+                queue.put_nowait(message["data"])
+
+    async def last_event(self, task_id: str):
+        """
+        Returns the stored terminal event for a task, if any.
+        """
+        await self._ensure_started()
+        return await self._redis.get(last_event_key(task_id))
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, task_id: str):
+        """
+        Yields an asyncio.Queue receiving raw event payloads for a task,
+        plus the RESYNC / CLOSED markers described on the class.
+        """
+        channel = task_channel(task_id)
+        queue = asyncio.Queue()
+
+        async with self._lock:
+            await self._ensure_started()
+            if channel not in self._listeners:
+                # Register only after SUBSCRIBE succeeds, so the reader
+                # never sees a listener without a live subscription.
+                await self._pubsub.subscribe(channel)
+                self._listeners[channel] = set()
+            self._listeners[channel].add(queue)
+
+        try:
+            yield queue
+        finally:
+            # Shielded: streams are usually torn down by cancellation when
+            # the client disconnects, and the release must still complete.
+            await asyncio.shield(self._release(channel, queue))
+
+    async def _release(self, channel: str, queue):
+        async with self._lock:
+            listeners = self._listeners.get(channel)
+            if listeners is not None:
+                listeners.discard(queue)
+                if not listeners:
+                    del self._listeners[channel]
+                    with contextlib.suppress(redis.RedisError):
+                        await self._pubsub.unsubscribe(channel)
+
+    async def close(self):
+        """
+        Stops the reader task and releases the Redis connection.
+        Intended for the application shutdown hook.
+        """
+        if self._reader is not None:
+            self._reader.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+        self._listeners.clear()
+
+
+hub = TaskEventHub()
+
+
+# -------------------------------------------------------------------------
+# EVENT STREAM
+# -------------------------------------------------------------------------
+
+def _decode(payload):
+    if isinstance(payload, bytes):
+        payload = payload.decode()
+    return payload
+
+
+def _is_terminal(payload: str) -> bool:
+    try:
+        return json.loads(payload).get("event") in TERMINAL_EVENTS
+    except (ValueError, AttributeError):
+        return False
+
+
+def _celery_outcome(task_id: str):
+    result = AsyncResult(task_id)
+    state = result.state
+    return state, (result.result if state == "SUCCESS" else None)
+
+
+def _result_url(value):
+    """
+    Extracts the R2 URL from a task's return value, if it carries one.
+
+    Tasks return either the URL itself (see r2_upload_bytes) or a dict
+    with a "url" entry.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict) and isinstance(value.get("url"), str):
+        return value["url"]
+    return None
+
+
+async def _celery_terminal_event(task_id: str):
+    """
+    Returns a terminal event derived from the Celery task state, or None
+    while the task is still pending / running or its state is unknown.
+
+    Used once when a stream opens and once when it times out, to catch
+    tasks that finished without publishing (e.g. a crashed worker) or
+    whose stored event has expired (LAST_EVENT_TTL).
+
+    • SUCCESS with a URL in the task result -> "done" with {"url": ...},
+      the same shape the worker publishes
+    • SUCCESS without one -> "result_ready", telling the client to fetch
+      the asset through the regular download path
+    • FAILURE / REVOKED -> "failed"
+    """
+    try:
+        state, value = await asyncio.to_thread(_celery_outcome, task_id)
+    except Exception:
+        return None
+
+    if state == "SUCCESS":
+        url = _result_url(value)
+        if url is not None:
+            return event_message("done", {"url": url})
+        return event_message("result_ready", {"task_id": task_id})
+    if state in FAILED_STATES:
+        return event_message("failed", {"state": state})
+    return None
+
+
+# Sent when Redis cannot be reached. It ends the stream but says nothing
+# about the task itself, which may still be running or already done.
+_UNAVAILABLE = event_message("unavailable", {"error": "event stream unavailable"})
+
+
+async def task_events(task_id: str):
+    """
+    Async generator of decoded event payloads for a task.
+
+    • Subscribes before reading the stored terminal event, so a result
+      published in between is not lost
+    • Falls back to one Celery state check if nothing is stored
+    • Yields None on each heartbeat interval without traffic
+    • Re-reads the stored terminal event after a hub reconnect
+    • Stops after the first terminal event, with a "timeout" event once
+      MAX_STREAM_LIFETIME has passed, or with an "unavailable" event if
+      Redis cannot be reached
+
+    Iterate it with contextlib.aclosing() so the subscription is released
+    as soon as the consumer stops.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MAX_STREAM_LIFETIME
+
+    try:
+        async with hub.subscribe(task_id) as queue:
+            last = await hub.last_event(task_id)
+            if last is None:
+                last = await _celery_terminal_event(task_id)
+            if last is not None:
+                yield _decode(last)
+                return
+
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    final = await _celery_terminal_event(task_id)
+                    yield final or event_message(
+                        "timeout", {"after": MAX_STREAM_LIFETIME}
+                    )
+                    return
+
+                try:
+                    payload = await asyncio.wait_for(
+                        queue.get(), min(HEARTBEAT_INTERVAL, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if payload is CLOSED:
+                    yield _UNAVAILABLE
+                    return
+
+                if payload is RESYNC:
+                    last = await hub.last_event(task_id)
+                    if last is not None:
+                        yield _decode(last)
+                        return
+                    continue
+
+                payload = _decode(payload)
+                yield payload
+                if _is_terminal(payload):
+                    return
+    except redis.RedisError:
+        yield _UNAVAILABLE
+
+
+# -------------------------------------------------------------------------
+# ROUTES
+# -------------------------------------------------------------------------
+
+router = APIRouter()
+
+
+@router.get("/tasks/{task_id}/events")
+async def stream_task_events(task_id: str):
+    """
+    Server-Sent Events stream for a task.
+
+    Each event is sent as a `data:` frame holding the JSON payload
+    ({"event": ..., "data": ...}); keep-alive comments are sent while
+    the task is idle.
+    """
+
+    async def frames():
+        async with contextlib.aclosing(task_events(task_id)) as events:
+            async for payload in events:
+                if payload is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"data: {payload}\n\n"
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/tasks/{task_id}/ws")
+async def websocket_task_events(websocket: WebSocket, task_id: str):
+    """
+    WebSocket variant of the task event stream.
+
+    Sends one text message per event, a {"event": "ping"} message on
+    each heartbeat, and closes after the terminal event. Incoming frames
+    are read in a separate task so a client disconnect ends the stream
+    (and its subscription) immediately.
+    """
+    await websocket.accept()
+
+    async with anyio.create_task_group() as tg:
+
+        async def send_events():
+            try:
+                async with contextlib.aclosing(task_events(task_id)) as events:
+                    async for payload in events:
+                        await websocket.send_text(payload or event_message("ping"))
+                await websocket.close()
+            except WebSocketDisconnect:
+                pass
+            tg.cancel_scope.cancel()
+
+        async def wait_disconnect():
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+            tg.cancel_scope.cancel()
+
+        tg.start_soon(send_events)
+        tg.start_soon(wait_disconnect)
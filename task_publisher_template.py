@@ -0,0 +1,120 @@
+"""
+Aetheron — Task Event Publisher Template
+----------------------------------------
+
+This module provides a documentation-safe structural template for the
+worker side of push-based task result delivery.
+
+Celery tasks publish progress and result events to a Redis pub/sub
+channel per task; the web process streams them to clients (see
+task_events_template.py). This module only depends on Redis and Celery,
+so the worker can import it without pulling in the web stack.
+
+The template preserves:
+• Channel and key naming shared with the web side
+• A worker-side publish helper
+• Celery signal handlers that publish "failed" for crashed or revoked
+  tasks
+
+The production implementation additionally includes:
+• Structured event payloads for each component pipeline
+• Publish retries and monitoring
+"""
+
+import os
+import json
+
+import redis
+from celery.signals import task_failure, task_revoked
+
+
+# -------------------------------------------------------------------------
+# ENVIRONMENT CONFIG
+# -------------------------------------------------------------------------
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+CHANNEL_PREFIX = "aetheron:task:"
+LAST_EVENT_TTL = 3600          # seconds a terminal event stays readable
+
+TERMINAL_EVENTS = ("done", "failed")
+
+
+def task_channel(task_id: str) -> str:
+    """
+    Returns the pub/sub channel name for a Celery task id.
+    """
+    return f"{CHANNEL_PREFIX}{task_id}"
+
+
+def last_event_key(task_id: str) -> str:
+    """
+    Returns the key holding a task's stored terminal event.
+    """
+    return f"{task_channel(task_id)}:last"
+
+
+def event_message(event: str, data: dict = None) -> str:
+    """
+    Serializes an event as {"event": ..., "data": ...}.
+    """
+    return json.dumps({"event": event, "data": data or {}})
+
+
+# -------------------------------------------------------------------------
+# PUBLISH
+# -------------------------------------------------------------------------
+
+_publisher = None
+
+
+def _publisher_client():
+    """
+    Returns a process-wide synchronous Redis client for Celery workers.
+    """
+    global _publisher
+    if _publisher is None:
+        _publisher = redis.Redis.from_url(REDIS_URL)
+    return _publisher
+
+
+def publish_task_event(task_id: str, event: str, data: dict = None):
+    """
+    Publishes a task event to its pub/sub channel.
+
+    Called from Celery tasks, e.g.:
+        publish_task_event(self.request.id, "progress", {"stage": "pdf"})
+        publish_task_event(self.request.id, "done", {"url": r2_url})
+
+    Terminal events ("done", "failed") are also stored under a short-lived
+    key, so a client that subscribes after the task finished still
+    receives the result without touching the Celery result backend.
+    """
+    message = event_message(event, data)
+    client = _publisher_client()
+
+    if event in TERMINAL_EVENTS:
+        client.set(last_event_key(task_id), message, ex=LAST_EVENT_TTL)
+
+    client.publish(task_channel(task_id), message)
+
+
+# -------------------------------------------------------------------------
+# CELERY SIGNALS
+# -------------------------------------------------------------------------
+
+@task_failure.connect
+def _publish_task_failure(sender=None, task_id=None, exception=None, **kwargs):
+    """
+    Publishes "failed" for tasks that raise, so their streams end even
+    when the task itself never reaches its own publish call.
+    """
+    publish_task_event(task_id, "failed", {"error": type(exception).__name__})
+
+
+@task_revoked.connect
+def _publish_task_revoked(sender=None, request=None, **kwargs):
+    """
+    Publishes "failed" for revoked tasks.
+    """
+    publish_task_event(request.id, "failed", {"error": "revoked"})